@@ -1,8 +1,12 @@
 import sqlite3
+from contextlib import asynccontextmanager
 from fastmcp import FastMCP
 import os
+import orjson
+import asyncio
 import aiosqlite  # Changed: sqlite3 → aiosqlite
 import tempfile
+from itertools import combinations
 
 
 # Use temporary directory which should be writable
@@ -14,12 +18,138 @@ CATEGORIES_PATH = os.path.join(os.path.dirname(__file__), "categories.json")
 
 print(f"Database path: {DB_PATH}")
 
-mcp = FastMCP("Expenses-tracker")
+async def _configure(c):
+    """Apply the tuned per-connection PRAGMAs.
+
+    These are connection-scoped (unlike journal_mode=WAL, which is
+    database-wide and set once in init_db), so they must run on every
+    connection or runtime connections fall back to synchronous=FULL and
+    the default tiny page cache.
+    """
+    await c.executescript(
+        "PRAGMA synchronous=NORMAL;"
+        "PRAGMA temp_store=MEMORY;"
+        "PRAGMA cache_size=-64000;"
+        "PRAGMA mmap_size=2147483648;"
+        "PRAGMA busy_timeout=5000;"
+        "PRAGMA foreign_keys=ON;"
+    )
+
+
+class AsyncConnectionPool:
+    """Pool of read-only connections plus a single read-write connection.
+
+    SQLite in WAL mode supports many concurrent readers and one writer, so
+    read tools fan out across the pool while writes funnel through the one
+    RW connection guarded by a lock. Connections are opened lazily and
+    tuned once at creation instead of per call.
+    """
+
+    def __init__(self, db_path, readers=4):
+        self._db_path = db_path
+        self._size = readers
+        self._readers: asyncio.Queue | None = None
+        self._writer: aiosqlite.Connection | None = None
+        self._write_lock = asyncio.Lock()
+        self._open_lock = asyncio.Lock()
+
+    async def _ensure_open(self):
+        if self._writer is not None:
+            return
+        async with self._open_lock:
+            if self._writer is not None:
+                return
+            writer = await aiosqlite.connect(self._db_path, isolation_level=None)
+            writer.row_factory = aiosqlite.Row
+            await _configure(writer)
+            # Readers share one page cache instead of allocating one each.
+            # The writer stays on a private cache: a shared-cache writer
+            # takes table locks that surface as SQLITE_LOCKED_SHAREDCACHE
+            # on the readers.
+            reader_uri = f"file:{self._db_path}?mode=ro&cache=shared"
+            readers = asyncio.Queue()
+            for _ in range(self._size):
+                c = await aiosqlite.connect(reader_uri, uri=True)
+                c.row_factory = aiosqlite.Row
+                await _configure(c)
+                # serializable reads; never observe uncommitted writer state
+                await c.execute("PRAGMA read_uncommitted=0")
+                readers.put_nowait(c)
+            self._readers = readers
+            self._writer = writer
+
+    @asynccontextmanager
+    async def reader(self):
+        """Acquire a read-only connection from the pool."""
+        await self._ensure_open()
+        c = await self._readers.get()
+        try:
+            yield c
+        finally:
+            self._readers.put_nowait(c)
+
+    @asynccontextmanager
+    async def writer(self):
+        """Acquire the single read-write connection."""
+        await self._ensure_open()
+        async with self._write_lock:
+            yield self._writer
+
+    async def close(self):
+        if self._writer is None:
+            return
+        while not self._readers.empty():
+            await self._readers.get_nowait().close()
+        # Refresh planner statistics before the long-lived connection goes
+        # away, per the SQLite docs' guidance for persistent connections
+        await self._writer.execute("PRAGMA optimize")
+        await self._writer.close()
+        self._readers = None
+        self._writer = None
+
+
+pool = AsyncConnectionPool(DB_PATH)
+
+# How often the background task refreshes planner statistics
+OPTIMIZE_INTERVAL_SECONDS = 6 * 3600
+
+
+async def _optimize_loop():
+    """Periodically run PRAGMA optimize so index statistics stay fresh."""
+    while True:
+        await asyncio.sleep(OPTIMIZE_INTERVAL_SECONDS)
+        async with pool.writer() as c:
+            await c.execute("PRAGMA optimize")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    optimize_task = asyncio.create_task(_optimize_loop())
+    flush_task = asyncio.create_task(_flush_loop())
+    try:
+        yield
+    finally:
+        optimize_task.cancel()
+        flush_task.cancel()
+        # Wait for the cancelled tasks so an interrupted in-flight flush
+        # re-queues its rows before the final flush below runs
+        for task in (optimize_task, flush_task):
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        try:
+            await _flush_pending()  # don't lose the last buffered window
+        except Exception as e:
+            print(f"Error flushing expenses on shutdown: {e}")
+        await pool.close()
+
+
+mcp = FastMCP("Expenses-tracker", lifespan=lifespan)
 
 def init_db():  # Keep as sync for initialization
     try:
         # Use synchronous sqlite3 just for initialization
-        import sqlite3
         with sqlite3.connect(DB_PATH) as c:
             c.execute("PRAGMA journal_mode=WAL")
             c.execute("""
@@ -32,10 +162,15 @@ def init_db():  # Keep as sync for initialization
                     note TEXT DEFAULT ''
                 )
             """)
-            # Test write access
-            c.execute("INSERT OR IGNORE INTO expenses(date, amount, category) VALUES ('2000-01-01', 0, 'test')")
-            c.execute("DELETE FROM expenses WHERE category = 'test'")
-            print("Database initialized successfully with write access")
+            # Secondary indexes so date-range and per-category queries are
+            # index scans instead of full table scans
+            c.execute("CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses(date)")
+            c.execute("CREATE INDEX IF NOT EXISTS idx_expenses_cat_date ON expenses(category, date)")
+        # Directory writability check instead of a probe row: the old
+        # INSERT/DELETE probe cost two WAL commits on every startup
+        if not os.access(os.path.dirname(DB_PATH), os.W_OK):
+            raise PermissionError(f"Database directory is not writable: {os.path.dirname(DB_PATH)}")
+        print("Database initialized successfully with write access")
     except Exception as e:
         print(f"Database initialization error: {e}")
         raise
@@ -43,178 +178,410 @@ def init_db():  # Keep as sync for initialization
 # Initialize database synchronously at module load
 init_db()
 
+INSERT_EXPENSE_SQL = "INSERT INTO expenses(date, amount, category, subcategory, note) VALUES (?,?,?,?,?)"
+
+# Rows per transaction in add_expenses; one fsync per chunk instead of per row
+BATCH_CHUNK_SIZE = 1000
+
+# RETURNING (SQLite 3.35+) gives back ids in the same statement execution,
+# skipping the extra worker-thread trip for lastrowid/rowcount
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+EXPENSE_COLUMNS = ("id", "date", "amount", "category", "subcategory", "note")
+
+# Default and ceiling for rows per page; the effective limit is clamped
+# to this so a wide date range can't buffer the whole table in Python
+# memory
+DEFAULT_PAGE_SIZE = 1000
+
+# Write-behind buffer for add_expense: rows wait here for up to
+# FLUSH_INTERVAL_SECONDS and land in one executemany transaction, so a
+# burst of adds pays one fsync per window instead of one per row. Every
+# other tool flushes the buffer first, so an id returned by add_expense
+# is always visible to the call that uses it; only a crash can lose a
+# window of buffered inserts.
+_pending: list[tuple] = []
+_flush_lock = asyncio.Lock()  # serialize flushes so none sees a half-done swap
+FLUSH_INTERVAL_SECONDS = 0.05
+
+# Ids handed out optimistically to buffered rows. Blocks are reserved by
+# bumping sqlite_sequence so AUTOINCREMENT inserts (add_expenses) can
+# never collide with an id already promised to a buffered row.
+_next_id = 0
+_ids_left = 0
+ID_RESERVE_BLOCK = 100
+
+BUFFERED_INSERT_SQL = "INSERT INTO expenses(id, date, amount, category, subcategory, note) VALUES (?,?,?,?,?,?)"
+
+# All 31 possible UPDATE statements, keyed by the set of fields being
+# changed. Fixed strings let SQLite's statement cache reuse the compiled
+# plan instead of parsing an ad-hoc statement per call.
+UPDATE_FIELDS = ("date", "amount", "category", "subcategory", "note")
+UPDATE_STMTS = {
+    frozenset(combo): "UPDATE expenses SET " + ", ".join(f"{f}=?" for f in combo) + " WHERE id=?"
+    for n in range(1, len(UPDATE_FIELDS) + 1)
+    for combo in combinations(UPDATE_FIELDS, n)
+}
+
+async def _reserve_ids():
+    """Reserve the next ID_RESERVE_BLOCK ids for buffered inserts.
+
+    Bumping sqlite_sequence makes AUTOINCREMENT skip the reserved range,
+    so direct inserts can't take an id already promised to the buffer.
+    """
+    global _next_id, _ids_left
+    async with pool.writer() as c:
+        cur = await c.execute("SELECT seq FROM sqlite_sequence WHERE name='expenses'")
+        row = await cur.fetchone()
+        if row is None:
+            cur = await c.execute("SELECT COALESCE(MAX(id), 0) FROM expenses")
+            start = (await cur.fetchone())[0]
+            await c.execute(
+                "INSERT INTO sqlite_sequence(name, seq) VALUES ('expenses', ?)",
+                (start + ID_RESERVE_BLOCK,)
+            )
+        else:
+            start = row[0]
+            await c.execute(
+                "UPDATE sqlite_sequence SET seq = seq + ? WHERE name='expenses'",
+                (ID_RESERVE_BLOCK,)
+            )
+        await c.commit()
+    _next_id = start + 1
+    _ids_left = ID_RESERVE_BLOCK
+
+
+async def _flush_pending():
+    """Write all buffered expenses in one transaction. Returns the count.
+
+    The lock makes concurrent callers wait for an in-flight flush to
+    commit instead of seeing the swapped-out (empty) buffer and reading
+    past rows that were acknowledged but not yet written.
+    """
+    global _pending
+    async with _flush_lock:
+        if not _pending:
+            return 0
+        rows, _pending = _pending, []
+        flushed = False
+        try:
+            async with pool.writer() as c:
+                await c.execute("BEGIN")
+                try:
+                    await c.executemany(BUFFERED_INSERT_SQL, rows)
+                    await c.commit()
+                except BaseException:
+                    # Leave the writer out of the open transaction, or every
+                    # later BEGIN fails with "cannot start a transaction
+                    # within a transaction"
+                    await c.rollback()
+                    raise
+            flushed = True
+        except Exception as e:
+            print(f"Error flushing buffered expenses: {e}")
+            raise
+        finally:
+            # Put the rows back so the next flush retries them; in a
+            # finally so cancellation mid-flush can't drop them
+            if not flushed:
+                _pending = rows + _pending
+        return len(rows)
+
+
+async def _flush_loop():
+    """Flush the write-behind buffer every FLUSH_INTERVAL_SECONDS."""
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+        try:
+            await _flush_pending()
+        except Exception:
+            pass  # already logged; rows stay queued for the next tick
+
+
 @mcp.tool()
-async def add_expense(date, amount, category, subcategory="", note=""):  
-    '''Add a new expense entry to the database.'''
+async def add_expense(date, amount, category, subcategory="", note=""):
+    '''Add a new expense entry to the database.
+
+    The row is buffered and flushed within ~50ms; call flush_expenses
+    afterwards if the caller needs it durable immediately.
+    '''
     try:
-        async with aiosqlite.connect(DB_PATH) as c:  
-            cur = await c.execute(  
-                "INSERT INTO expenses(date, amount, category, subcategory, note) VALUES (?,?,?,?,?)",
-                (date, amount, category, subcategory, note)
-            )
-            expense_id = cur.lastrowid
-            await c.commit()  
-            return {"status": "success", "id": expense_id, "message": "Expense added successfully"}
-    except Exception as e:  
+        # The table's NOT NULL columns must be checked before buffering:
+        # a bad row that only fails at flush time would poison the whole
+        # batch after this call already reported success
+        if date is None or category is None:
+            return {"status": "error", "message": "date and category are required."}
+        if amount is None or isinstance(amount, bool) or not isinstance(amount, (int, float)):
+            return {"status": "error", "message": "amount must be a number."}
+
+        global _next_id, _ids_left
+        if _ids_left == 0:
+            await _reserve_ids()
+        expense_id = _next_id
+        _next_id += 1
+        _ids_left -= 1
+        _pending.append((expense_id, date, amount, category, subcategory, note))
+        return {"status": "success", "id": expense_id, "message": "Expense added successfully"}
+    except Exception as e:
         if "readonly" in str(e).lower():
             return {"status": "error", "message": "Database is in read-only mode. Check file permissions."}
         return {"status": "error", "message": f"Database error: {str(e)}"}
-    
 
 
 @mcp.tool()
-async def get_all_expenses():
-    """Retrieve all expenses from the database."""
+async def flush_expenses():
+    """Flush buffered expenses to disk immediately."""
     try:
-        async with aiosqlite.connect(DB_PATH) as c:
-            cur = await c.execute(
-                "SELECT id, date, amount, category, subcategory, note FROM expenses ORDER BY date ASC"
-            )
-            rows = await cur.fetchall()
-            cols = [description[0] for description in cur.description]
-            return [dict(zip(cols, row)) for row in rows]
+        count = await _flush_pending()
+        return {"status": "success", "count": count, "message": f"Flushed {count} buffered expenses."}
     except Exception as e:
-        return {"status": "error", "message": f"Error listing expenses: {str(e)}"}
+        return {"status": "error", "message": f"Error flushing expenses: {str(e)}"}
+
 
 
 @mcp.tool()
-async def list_expenses_by_date(start_date, end_date):
-    """List expenses within a date range."""
+async def add_expenses(expenses):
+    """Add many expense entries in one call.
+
+    Each entry is a dict with date, amount, category and optional
+    subcategory/note. Rows are inserted with executemany in chunked
+    transactions so bulk imports pay one commit per chunk instead of
+    one per row.
+    """
     try:
-        async with aiosqlite.connect(DB_PATH) as c:
-            cur = await c.execute(
-                "SELECT id, date, amount, category, subcategory, note FROM expenses WHERE date BETWEEN ? AND ? ORDER BY date ASC",
-                (start_date, end_date)
-            )
-            rows = await cur.fetchall()
-            cols = [description[0] for description in cur.description]
-            return [dict(zip(cols, row)) for row in rows]
+        rows = [
+            (e["date"], e["amount"], e["category"], e.get("subcategory", ""), e.get("note", ""))
+            for e in expenses
+        ]
+        if not rows:
+            return {"status": "error", "message": "No expenses to add."}
+
+        # Land earlier buffered adds first so insertion order is kept
+        await _flush_pending()
+
+        async with pool.writer() as c:
+            for start in range(0, len(rows), BATCH_CHUNK_SIZE):
+                await c.execute("BEGIN")
+                try:
+                    await c.executemany(INSERT_EXPENSE_SQL, rows[start:start + BATCH_CHUNK_SIZE])
+                    await c.commit()
+                except BaseException:
+                    # A failed chunk must not leave the writer inside the
+                    # open transaction or land its rows via a later commit
+                    await c.rollback()
+                    raise
+            # Bulk loads can shift the data distribution enough to change
+            # which index the planner should pick
+            await c.execute("ANALYZE expenses")
+        return {"status": "success", "count": len(rows), "message": f"Added {len(rows)} expenses."}
+    except KeyError as e:
+        return {"status": "error", "message": f"Missing required field: {str(e)}"}
     except Exception as e:
-        return {"status": "error", "message": f"Error listing expenses by date: {str(e)}"}
+        if "readonly" in str(e).lower():
+            return {"status": "error", "message": "Database is in read-only mode. Check file permissions."}
+        return {"status": "error", "message": f"Database error: {str(e)}"}
+
+
+async def _columnar(cur, cols):
+    """Collect cursor rows into a column-oriented dict of lists.
+
+    One list per column instead of one dict per row: column names appear
+    once in the payload and the per-row dict allocations disappear.
+    """
+    data = {name: [] for name in cols}
+    columns = [data[name] for name in cols]
+    async for row in cur:
+        for values, v in zip(columns, row):
+            values.append(v)
+    return data
 
 
 @mcp.tool()
-async def summarize(start_date, end_date, category=None):
-    """Summarize expenses by category within a date range."""
-    try:
-        async with aiosqlite.connect(DB_PATH) as c:
-            query = (
-                "SELECT category, SUM(amount) as total_amount "
-                "FROM expenses "
-                "WHERE date BETWEEN ? AND ?"
-            )
-            params = [start_date, end_date]
+async def get_all_expenses():
+    """Retrieve all expenses from the database.
 
-            if category:
-                query += " AND category=?"
-                params.append(category)
+    Returns a column-oriented payload: {"id": [...], "date": [...], ...}
+    with the lists aligned by position.
+    """
+    try:
+        await _flush_pending()
+        async with pool.reader() as c:
+            async with c.execute(
+                "SELECT id, date, amount, category, subcategory, note FROM expenses ORDER BY date ASC"
+            ) as cur:
+                return await _columnar(cur, EXPENSE_COLUMNS)
+    except Exception as e:
+        return {"status": "error", "message": f"Error listing expenses: {str(e)}"}
 
-            query += " GROUP BY category ORDER BY category ASC"
 
-            cur = await c.execute(query, params)
-            rows = await cur.fetchall()
-            cols = [description[0] for description in cur.description]
-            return [dict(zip(cols, row)) for row in rows]
+@mcp.tool()
+async def list_expenses_by_date(start_date, end_date, fields=None, limit=DEFAULT_PAGE_SIZE, offset=0):
+    """List expenses within a date range.
+
+    Results are paged (limit is clamped to at most 1000; use offset for
+    the next page) and optionally projected to only the requested
+    fields. The payload is column-oriented: {"id": [...], "date": [...],
+    ...} with the lists aligned by position.
+    """
+    try:
+        await _flush_pending()
+        # Clamp rather than trust the caller: limit=-1 means "no limit"
+        # to SQLite, which defeats the point of paging
+        limit = max(1, min(int(limit), DEFAULT_PAGE_SIZE))
+        offset = max(0, int(offset))
+        if fields:
+            bad = [f for f in fields if f not in EXPENSE_COLUMNS]
+            if bad:
+                return {"status": "error", "message": f"Unknown fields: {', '.join(bad)}"}
+            cols = tuple(fields)
+        else:
+            cols = EXPENSE_COLUMNS
+
+        query = (
+            f"SELECT {', '.join(cols)} FROM expenses "
+            "WHERE date BETWEEN ? AND ? ORDER BY date ASC LIMIT ? OFFSET ?"
+        )
+        async with pool.reader() as c:
+            async with c.execute(query, (start_date, end_date, limit, offset)) as cur:
+                return await _columnar(cur, cols)
     except Exception as e:
-        return {"status": "error", "message": f"Error summarizing expenses by date: {str(e)}"}
+        return {"status": "error", "message": f"Error listing expenses by date: {str(e)}"}
 
 
 @mcp.tool()
-async def delete_expense_by_id_catogery(catogery, expense_id):
-    """Delete an expense by ID."""
+async def count_expenses(start_date, end_date):
+    """Count expenses within a date range without fetching the rows."""
     try:
-        async with aiosqlite.connect(DB_PATH) as c:
+        await _flush_pending()
+        async with pool.reader() as c:
             cur = await c.execute(
-                "DELETE FROM expenses WHERE id=? AND category=?",
-                (expense_id, catogery)
+                "SELECT COUNT(*) FROM expenses WHERE date BETWEEN ? AND ?",
+                (start_date, end_date)
             )
-            await c.commit()
-            if cur.rowcount == 0:
-                return {"status": "error", "message": "No expense found with the given ID and category."}
-            return {"status": "success", "message": "Expense deleted successfully."}
+            row = await cur.fetchone()
+            return {"status": "success", "count": row[0]}
     except Exception as e:
-        return {"status": "error", "message": f"Error deleting expense: {str(e)}"}
-    
+        return {"status": "error", "message": f"Error counting expenses: {str(e)}"}
+
 
 @mcp.tool()
-async def delete_expense_by_id(expense_id):
-    """Delete an expense by ID."""
+async def sum_by_month(start_date, end_date):
+    """Total expenses per month within a date range, aggregated in SQL."""
     try:
-        async with aiosqlite.connect(DB_PATH) as c:
+        await _flush_pending()
+        async with pool.reader() as c:
             cur = await c.execute(
-                "DELETE FROM expenses WHERE id=?",
-                (expense_id,)
+                "SELECT strftime('%Y-%m', date) AS month, SUM(amount) AS total_amount "
+                "FROM expenses WHERE date BETWEEN ? AND ? GROUP BY 1 ORDER BY 1 ASC",
+                (start_date, end_date)
             )
-            await c.commit()
-            if cur.rowcount == 0:
-                return {"status": "error", "message": "No expense found with the given ID."}
-            return {"status": "success", "message": "Expense deleted successfully."}
+            rows = await cur.fetchall()
+            return [{"month": month, "total_amount": total} for month, total in rows]
     except Exception as e:
-        return {"status": "error", "message": f"Error deleting expense: {str(e)}"}
+        return {"status": "error", "message": f"Error summing expenses by month: {str(e)}"}
+
 
 @mcp.tool()
-async def delete_expenses_by_category(category):
-    """Delete all expenses in a given category."""
+async def summarize(start_date, end_date, category=None):
+    """Summarize expenses by category within a date range."""
     try:
-        async with aiosqlite.connect(DB_PATH) as c:
-            cur = await c.execute(
-                "DELETE FROM expenses WHERE category=?",
-                (category,)
-            )
-            await c.commit()
-            return {"status": "success", "message": f"Deleted {cur.rowcount} expenses in category '{category}'."}
+        await _flush_pending()
+        query = (
+            "SELECT category, SUM(amount) as total_amount "
+            "FROM expenses "
+            "WHERE date BETWEEN ? AND ?"
+        )
+        params = [start_date, end_date]
+
+        if category:
+            query += " AND category=?"
+            params.append(category)
+
+        query += " GROUP BY category ORDER BY category ASC"
+
+        async with pool.reader() as c:
+            cur = await c.execute(query, params)
+            rows = await cur.fetchall()
+            return [dict(r) for r in rows]
     except Exception as e:
-        return {"status": "error", "message": f"Error deleting expenses by category: {str(e)}"}
-    
+        return {"status": "error", "message": f"Error summarizing expenses by date: {str(e)}"}
+
 
 @mcp.tool()
-async def delete_all_expenses():
-    """Delete all expenses from the database."""
+async def delete_expenses(expense_id=None, category=None, before_date=None, confirm_all=False):
+    """Delete expenses matching the given filters.
+
+    Filters combine with AND: expense_id, category and/or before_date
+    (exclusive). Deleting everything requires confirm_all=True so a call
+    with no filters can't wipe the table by accident.
+    """
     try:
-        async with aiosqlite.connect(DB_PATH) as c:
-            cur = await c.execute("DELETE FROM expenses")
+        await _flush_pending()
+        conditions = []
+        params = []
+
+        if expense_id is not None:
+            conditions.append("id=?")
+            params.append(expense_id)
+        if category is not None:
+            conditions.append("category=?")
+            params.append(category)
+        if before_date is not None:
+            conditions.append("date<?")
+            params.append(before_date)
+
+        if not conditions and not confirm_all:
+            return {"status": "error", "message": "No filters given. Pass confirm_all=True to delete all expenses."}
+
+        query = "DELETE FROM expenses"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        async with pool.writer() as c:
+            if HAS_RETURNING:
+                cur = await c.execute(query + " RETURNING id", params)
+                deleted = len(await cur.fetchall())
+            else:
+                cur = await c.execute(query, params)
+                deleted = cur.rowcount
             await c.commit()
-            return {"status": "success", "message": f"Deleted all expenses ({cur.rowcount} records)."}
+
+        if deleted == 0 and expense_id is not None:
+            return {"status": "error", "message": "No expense found matching the given filters."}
+        return {"status": "success", "count": deleted, "message": f"Deleted {deleted} expenses."}
     except Exception as e:
-        return {"status": "error", "message": f"Error deleting all expenses: {str(e)}"}
-    
+        return {"status": "error", "message": f"Error deleting expenses: {str(e)}"}
+
 
 
 @mcp.tool()
 async def update_expense(expense_id, date=None, amount=None, category=None, subcategory=None, note=None):
     """Update an existing expense entry."""
     try:
-        async with aiosqlite.connect(DB_PATH) as c:
-            fields = []
-            params = []
-
-            if date is not None:
-                fields.append("date=?")
-                params.append(date)
-            if amount is not None:
-                fields.append("amount=?")
-                params.append(amount)
-            if category is not None:
-                fields.append("category=?")
-                params.append(category)
-            if subcategory is not None:
-                fields.append("subcategory=?")
-                params.append(subcategory)
-            if note is not None:
-                fields.append("note=?")
-                params.append(note)
-
-            if not fields:
-                return {"status": "error", "message": "No fields to update."}
-
-            params.append(expense_id)
-            query = f"UPDATE expenses SET {', '.join(fields)} WHERE id=?"
-            cur = await c.execute(query, params)
+        await _flush_pending()
+        values = {"date": date, "amount": amount, "category": category,
+                  "subcategory": subcategory, "note": note}
+        provided = {f: v for f, v in values.items() if v is not None}
+
+        if not provided:
+            return {"status": "error", "message": "No fields to update."}
+
+        # Bind in UPDATE_FIELDS order to match the precompiled statement
+        query = UPDATE_STMTS[frozenset(provided)]
+        params = [provided[f] for f in UPDATE_FIELDS if f in provided]
+        params.append(expense_id)
+        async with pool.writer() as c:
+            if HAS_RETURNING:
+                cur = await c.execute(query + " RETURNING id", params)
+                updated = len(await cur.fetchall())
+            else:
+                cur = await c.execute(query, params)
+                updated = cur.rowcount
             await c.commit()
 
-            if cur.rowcount == 0:
-                return {"status": "error", "message": "No expense found with the given ID."}
-            return {"status": "success", "message": "Expense updated successfully."}
+        if updated == 0:
+            return {"status": "error", "message": "No expense found with the given ID."}
+        return {"status": "success", "message": "Expense updated successfully."}
     except Exception as e:
         return {"status": "error", "message": f"Error updating expense: {str(e)}"}
     
@@ -237,31 +604,43 @@ def add_expense_prompt()-> str:
 
 
 
+# Serialized once at import so the missing-file fallback never re-encodes
+_DEFAULT_CATEGORIES_JSON = orjson.dumps({
+    "categories": [
+        "Food & Dining",
+        "Transportation",
+        "Shopping",
+        "Entertainment",
+        "Bills & Utilities",
+        "Healthcare",
+        "Travel",
+        "Education",
+        "Business",
+        "Other"
+    ]
+}, option=orjson.OPT_INDENT_2).decode()
+
+# (mtime, contents) of the last categories.json read; clients fetch this
+# resource constantly and the file changes approximately never
+_CATEGORIES_CACHE: tuple[float, str] | None = None
+
+
 @mcp.resource("expense:///categories", mime_type="application/json")  # Changed: expense:// → expense:///
 def categories():
+    global _CATEGORIES_CACHE
     try:
-        # Provide default categories if file doesn't exist
-        default_categories = {
-            "categories": [
-                "Food & Dining",
-                "Transportation",
-                "Shopping",
-                "Entertainment",
-                "Bills & Utilities",
-                "Healthcare",
-                "Travel",
-                "Education",
-                "Business",
-                "Other"
-            ]
-        }
-        
         try:
-            with open(CATEGORIES_PATH, "r", encoding="utf-8") as f:
-                return f.read()
+            mtime = os.stat(CATEGORIES_PATH).st_mtime
         except FileNotFoundError:
-            import json
-            return json.dumps(default_categories, indent=2)
+            return _DEFAULT_CATEGORIES_JSON
+
+        if _CATEGORIES_CACHE is not None and _CATEGORIES_CACHE[0] == mtime:
+            return _CATEGORIES_CACHE[1]
+
+        with open(CATEGORIES_PATH, "r", encoding="utf-8") as f:
+            contents = f.read()
+        _CATEGORIES_CACHE = (mtime, contents)
+        return contents
     except Exception as e:
         return f'{{"error": "Could not load categories: {str(e)}"}}'
 